@@ -91,3 +91,54 @@ VITE_MANIFEST_PATH = BASE_DIR.parent / "frontend" / "dist" / "manifest.json"
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# Comma-separated read replicas of REDIS_URL. Writes always go to REDIS_URL;
+# searches are spread over healthy replicas and fall back to REDIS_URL.
+REDIS_REPLICA_URLS = [
+    url.strip() for url in os.getenv("REDIS_REPLICA_URLS", "").split(",") if url.strip()
+]
+REDIS_REPLICA_HEALTH_CHECK_SECONDS = 5
+REDIS_REPLICA_RETRY_SECONDS = 30
+REDIS_SOCKET_TIMEOUT = 5
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://192.168.50.17:11434")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "qwen3-embedding:0.6b")
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDING_WORKERS = 4
+
+# Uploaded files are decoded and split in a process pool. Every web worker
+# owns its own pool, so keep this small. SPLIT_PROCESS_PYTHON overrides the
+# interpreter used for pool workers (under uWSGI sys.executable is uwsgi).
+SPLIT_PROCESS_WORKERS = int(os.getenv("SPLIT_PROCESS_WORKERS", "2"))
+SPLIT_PROCESS_PYTHON = os.getenv("SPLIT_PROCESS_PYTHON")
+
+# RecursiveCharacterTextSplitter options per file extension, layered over "default".
+TEXT_SPLITTER_OPTIONS = {
+    "default": {
+        "chunk_size": 500,
+        "chunk_overlap": 100,
+    },
+}
+
+# Vector store used for document chunks: "redis" (Redis Stack) or "numpy"
+# (in-process brute-force search, suited to small corpora and tests).
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "redis")
+VECTOR_STORE_OPTIONS = {
+    "redis": {
+        "index_name": "idx_chunks",
+        "replica_urls": REDIS_REPLICA_URLS,
+    },
+    "numpy": {
+        "path": os.getenv("NUMPY_VECTOR_STORE_PATH", str(BASE_DIR / "vector_index")),
+        "dtype": os.getenv("NUMPY_VECTOR_STORE_DTYPE", "float32"),
+    },
+}
+
+# Total time budget for one chat request and the share of it each stage may use.
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+REQUEST_STAGE_BUDGETS = {
+    "embedding": 0.1,
+    "retrieval": 0.15,
+    "web_search": 0.25,
+    "generation": 1.0,
+}
@@ -0,0 +1,91 @@
+"""Per-request deadline bookkeeping for the chat pipeline."""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+DEFAULT_REQUEST_DEADLINE_SECONDS = 60.0
+DEFAULT_STAGE_BUDGETS = {
+    "embedding": 0.1,
+    "retrieval": 0.15,
+    "web_search": 0.25,
+    "generation": 1.0,
+}
+
+# Stage work runs on a shared pool so a stuck dependency can be abandoned
+# without blocking the request thread past its deadline.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "REQUEST_STAGE_WORKERS", 16),
+    thread_name_prefix="request-stage",
+)
+
+
+class StageSkipped(Exception):
+    """Raised when a pipeline stage timed out or failed and was skipped."""
+
+    def __init__(self, stage: str, reason: str, timed_out: bool = False):
+        super().__init__(f"{stage}: {reason}")
+        self.stage = stage
+        self.reason = reason
+        self.timed_out = timed_out
+
+
+class Deadline:
+    """Track the total time budget of one request and split it across stages."""
+
+    def __init__(self, total_seconds: float | None = None, budgets: dict | None = None):
+        if total_seconds is None:
+            total_seconds = getattr(
+                settings, "REQUEST_DEADLINE_SECONDS", DEFAULT_REQUEST_DEADLINE_SECONDS
+            )
+        if budgets is None:
+            budgets = getattr(settings, "REQUEST_STAGE_BUDGETS", DEFAULT_STAGE_BUDGETS)
+
+        self.total_seconds = float(total_seconds)
+        self.budgets = budgets
+        self.expires_at = time.monotonic() + self.total_seconds
+        self.skipped: list[dict[str, str]] = []
+
+    def remaining(self) -> float:
+        """Return the seconds left before the request deadline."""
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def stage_timeout(self, stage: str) -> float:
+        """Return the time a stage may use: its share of the total, capped by what is left."""
+
+        share = float(self.budgets.get(stage, 1.0))
+        return min(self.total_seconds * share, self.remaining())
+
+    def submit(self, stage: str, fn, *args, **kwargs) -> tuple[Future, float]:
+        """Start a stage in the background and return its future and absolute stage deadline."""
+
+        stage_deadline = time.monotonic() + self.stage_timeout(stage)
+        return _executor.submit(fn, *args, **kwargs), stage_deadline
+
+    def wait(self, stage: str, future: Future, stage_deadline: float):
+        """Wait for a submitted stage, cancelling and recording it if it overruns or fails."""
+
+        timeout = max(0.0, min(stage_deadline, self.expires_at) - time.monotonic())
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._skip(stage, "exceeded its time budget", timed_out=True)
+        except Exception as exc:
+            self._skip(stage, f"failed: {exc}")
+
+    def run(self, stage: str, fn, *args, **kwargs):
+        """Run a stage within its budget; raise StageSkipped if it cannot finish."""
+
+        if self.remaining() <= 0:
+            self._skip(stage, "request deadline already exceeded", timed_out=True)
+
+        future, stage_deadline = self.submit(stage, fn, *args, **kwargs)
+        return self.wait(stage, future, stage_deadline)
+
+    def _skip(self, stage: str, reason: str, timed_out: bool = False):
+        self.skipped.append({"stage": stage, "reason": reason})
+        raise StageSkipped(stage, reason, timed_out=timed_out)
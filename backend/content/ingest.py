@@ -0,0 +1,207 @@
+"""Decoding, splitting and embedding of uploaded files.
+
+CPU-bound work (UTF-8 decoding, loading and text splitting) runs in a
+reusable process pool so it is not serialised under the request thread's
+GIL. Embedding is I/O-bound (HTTP to Ollama) and runs on a thread pool, so
+the first files' chunks are being embedded while later files are still
+being split.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from django.conf import settings
+
+ALLOWED_FILE_TYPES = {"txt", "doc", "docx"}
+MAX_FILE_SIZE_BYTES = 1 * 1024 * 1024  # 1 MB
+
+DEFAULT_SPLITTER_OPTIONS = {"chunk_size": 500, "chunk_overlap": 100}
+DEFAULT_EMBEDDING_BATCH_SIZE = 64
+# Every server worker process owns a pool, so keep it small.
+DEFAULT_SPLIT_PROCESS_WORKERS = 2
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+_embedding_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "EMBEDDING_WORKERS", 4),
+    thread_name_prefix="embedding",
+)
+
+
+class IngestError(Exception):
+    """Raised when an uploaded file cannot be decoded or loaded."""
+
+
+def _load_documents_from_bytes(file_bytes: bytes, extension: str, file_name: str):
+    """Persist uploaded bytes temporarily and load them with TextLoader."""
+
+    from langchain_community.document_loaders import TextLoader
+
+    suffix = f".{extension}" if extension else ""
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(file_bytes)
+            tmp_path = tmp_file.name
+
+        loader = TextLoader(tmp_path, encoding="utf-8")
+        documents = loader.load()
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    for document in documents:
+        document.metadata["source"] = file_name
+
+    return documents
+
+
+def split_file(file_name: str, extension: str, file_bytes: bytes, splitter_options: dict) -> dict:
+    """Decode, load and split one file. Runs inside a pool worker process."""
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    started = time.perf_counter()
+    try:
+        file_content = file_bytes.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise IngestError(
+            f"Only UTF-8 encoded text files are supported (failed on '{file_name}')."
+        ) from exc
+
+    try:
+        documents = _load_documents_from_bytes(file_bytes, extension, file_name)
+    except Exception as exc:  # pragma: no cover - defensive guard
+        raise IngestError(f"Unable to load document '{file_name}': {exc}") from exc
+    loaded = time.perf_counter()
+
+    text_splitter = RecursiveCharacterTextSplitter(**splitter_options)
+    chunks = text_splitter.split_documents(documents)
+    finished = time.perf_counter()
+
+    return {
+        "chunks": chunks,
+        "content_length": len(file_content),
+        "load_seconds": loaded - started,
+        "split_seconds": finished - loaded,
+    }
+
+
+def get_splitter_options(extension: str) -> dict:
+    """Return the text splitter options configured for a file extension."""
+
+    configured = getattr(settings, "TEXT_SPLITTER_OPTIONS", {})
+    options = dict(DEFAULT_SPLITTER_OPTIONS)
+    options.update(configured.get("default", {}))
+    options.update(configured.get(extension, {}))
+    return options
+
+
+def _python_executable() -> str:
+    """Return a Python interpreter for spawned workers.
+
+    Under uWSGI ``sys.executable`` is the uwsgi binary unless
+    ``py-sys-executable`` is set, and spawning that breaks the pool.
+    """
+
+    configured = getattr(settings, "SPLIT_PROCESS_PYTHON", None)
+    if configured:
+        return configured
+    if os.path.basename(sys.executable).startswith("python"):
+        return sys.executable
+    return os.path.join(sys.exec_prefix, "bin", "python3")
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            # "spawn" avoids forking a multi-threaded server process.
+            context = multiprocessing.get_context("spawn")
+            context.set_executable(_python_executable())
+            _process_pool = ProcessPoolExecutor(
+                max_workers=getattr(
+                    settings, "SPLIT_PROCESS_WORKERS", DEFAULT_SPLIT_PROCESS_WORKERS
+                ),
+                mp_context=context,
+            )
+        return _process_pool
+
+
+def _reset_process_pool() -> None:
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def split_files(files: list[tuple[str, str, bytes]], skip_errors: bool = False):
+    """Split ``(file_name, extension, file_bytes)`` tuples in the process pool.
+
+    Yields ``(position, result)`` pairs in completion order, where ``result``
+    is the dict returned by :func:`split_file` plus ``wall_seconds``. Raises
+    :class:`IngestError` for the first file that cannot be processed and
+    cancels the remaining queued files, unless ``skip_errors`` is set, in
+    which case that file's result is ``{"error": message}`` instead.
+    """
+
+    pool = _get_process_pool()
+    submitted_at = time.perf_counter()
+    try:
+        futures = {
+            pool.submit(
+                split_file,
+                file_name,
+                extension,
+                file_bytes,
+                get_splitter_options(extension),
+            ): position
+            for position, (file_name, extension, file_bytes) in enumerate(files)
+        }
+    except BrokenProcessPool:
+        _reset_process_pool()
+        raise
+
+    try:
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except IngestError as exc:
+                if not skip_errors:
+                    raise
+                yield futures[future], {"error": str(exc)}
+                continue
+            result["wall_seconds"] = time.perf_counter() - submitted_at
+            yield futures[future], result
+    except BrokenProcessPool:
+        _reset_process_pool()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _embed_batches(embedder, texts: list[str], batch_size: int):
+    started = time.perf_counter()
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embedder.embed_documents(texts[start : start + batch_size]))
+    return np.asarray(vectors, dtype=np.float32), time.perf_counter() - started
+
+
+def submit_embedding(embedder, chunks):
+    """Start embedding ``chunks`` in the background; the future yields ``(vectors, seconds)``."""
+
+    batch_size = getattr(settings, "EMBEDDING_BATCH_SIZE", DEFAULT_EMBEDDING_BATCH_SIZE)
+    texts = [chunk.page_content for chunk in chunks]
+    return _embedding_executor.submit(_embed_batches, embedder, texts, batch_size)
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.snapshot import SnapshotError, export_snapshot
+from content.vector_store import get_vector_store
+
+
+class Command(BaseCommand):
+    help = "Export the vector index (embeddings, chunk text and metadata) to a snapshot directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Directory to write the snapshot to.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of chunks read from the vector store at a time.",
+        )
+
+    def handle(self, *args, **options):
+        embedding_model = getattr(settings, "EMBEDDING_MODEL", "qwen3-embedding:0.6b")
+        try:
+            manifest = export_snapshot(
+                get_vector_store(),
+                options["path"],
+                embedding_model=embedding_model,
+                batch_size=options["batch_size"],
+            )
+        except (SnapshotError, RuntimeError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {manifest['count']} chunks "
+                f"({manifest['dimensions']} dimensions, model '{embedding_model}') "
+                f"to {options['path']}."
+            )
+        )
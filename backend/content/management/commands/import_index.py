@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.snapshot import SnapshotError, import_snapshot
+from content.vector_store import get_vector_store
+
+
+class Command(BaseCommand):
+    help = "Bulk-load a snapshot written by export_index without re-embedding any chunk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot directory to load.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of chunks written to the vector store per pipelined batch.",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete existing chunks for every source in the snapshot before loading.",
+        )
+        parser.add_argument(
+            "--allow-model-mismatch",
+            action="store_true",
+            help="Load even if the snapshot was built with a different embedding model.",
+        )
+
+    def handle(self, *args, **options):
+        embedding_model = getattr(settings, "EMBEDDING_MODEL", "qwen3-embedding:0.6b")
+        started = time.monotonic()
+        loaded = 0
+        try:
+            for loaded in import_snapshot(
+                get_vector_store(),
+                options["path"],
+                embedding_model=embedding_model,
+                batch_size=options["batch_size"],
+                allow_model_mismatch=options["allow_model_mismatch"],
+                replace=options["replace"],
+            ):
+                self.stdout.write(f"Loaded {loaded} chunks...")
+        except (SnapshotError, RuntimeError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {loaded} chunks in {elapsed:.1f}s.")
+        )
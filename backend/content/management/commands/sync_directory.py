@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from langchain_ollama import OllamaEmbeddings
+
+from content.ingest import (
+    ALLOWED_FILE_TYPES,
+    MAX_FILE_SIZE_BYTES,
+    split_files,
+    submit_embedding,
+)
+from content.vector_store import get_vector_store
+
+STATE_FILE_NAME = ".index_sync_state.json"
+DEFAULT_CHECKPOINT_SECONDS = 30.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync a directory tree into the vector index: ingest new and changed files "
+        "and remove chunks for files that were deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Directory to sync.")
+        parser.add_argument(
+            "--state-file",
+            help=(
+                "Where to record what has been indexed, so interrupted runs resume "
+                f"where they stopped. Defaults to <path>/{STATE_FILE_NAME}."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=32,
+            help="Number of files split, embedded and written per batch.",
+        )
+        parser.add_argument(
+            "--max-file-size",
+            type=int,
+            default=MAX_FILE_SIZE_BYTES,
+            help="Skip files larger than this many bytes.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running and rescan the directory every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10.0,
+            help="Seconds between scans in --watch mode.",
+        )
+        parser.add_argument(
+            "--checkpoint-interval",
+            type=float,
+            default=DEFAULT_CHECKPOINT_SECONDS,
+            help=(
+                "Seconds between writes of the vector store and the sync state during a "
+                "scan. An interrupted run resumes from the last checkpoint."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        root = Path(options["path"]).resolve()
+        if not root.is_dir():
+            raise CommandError(f"'{root}' is not a directory.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        state_path = Path(options["state_file"] or root / STATE_FILE_NAME).resolve()
+        embedding_model = getattr(settings, "EMBEDDING_MODEL", "qwen3-embedding:0.6b")
+        embedder = OllamaEmbeddings(
+            model=embedding_model,
+            base_url=getattr(settings, "OLLAMA_BASE_URL", "http://192.168.50.17:11434"),
+        )
+        vector_store = get_vector_store(embedder)
+
+        try:
+            while True:
+                try:
+                    self._sync_once(
+                        root,
+                        state_path,
+                        vector_store,
+                        embedding_model,
+                        batch_size=options["batch_size"],
+                        max_file_size=options["max_file_size"],
+                        checkpoint_interval=options["checkpoint_interval"],
+                    )
+                except Exception as exc:
+                    if not options["watch"]:
+                        raise CommandError(str(exc)) from exc
+                    self.stderr.write(f"Sync failed, retrying in {options['interval']}s: {exc}")
+                if not options["watch"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def _sync_once(
+        self,
+        root,
+        state_path,
+        vector_store,
+        embedding_model,
+        batch_size,
+        max_file_size,
+        checkpoint_interval,
+    ):
+        started = time.monotonic()
+        state = _load_state(state_path)
+        files = state["files"]
+        if state.get("embedding_model") not in (None, embedding_model):
+            self.stderr.write(
+                f"Index was synced with embedding model '{state['embedding_model']}'; "
+                f"re-ingesting every file with '{embedding_model}'."
+            )
+            for entry in files.values():
+                entry["mtime_ns"] = None
+                entry["sha256"] = None
+        state["embedding_model"] = embedding_model
+
+        seen: set[str] = set()
+        candidates = []
+        skipped = 0
+        for path in sorted(root.rglob("*")):
+            extension = path.suffix[1:].lower()
+            if extension not in ALLOWED_FILE_TYPES or path == state_path or not path.is_file():
+                continue
+
+            relative_name = path.relative_to(root).as_posix()
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed while scanning; treated as deleted below.
+                continue
+            seen.add(relative_name)
+            entry = files.get(relative_name)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            if stat.st_size > max_file_size:
+                skipped += 1
+                self.stderr.write(f"Skipping '{relative_name}': larger than {max_file_size} bytes.")
+                continue
+            candidates.append((relative_name, path, extension))
+
+        deleted = set(files) - seen
+        totals = Counter()
+        # Writes are grouped between checkpoints, so a backend that rewrites its
+        # whole index per write (NumPy) does so once per checkpoint, not per
+        # batch. The state is saved only after the store has been flushed.
+        with vector_store.buffered_writes():
+            if deleted:
+                vector_store.delete_sources(deleted)
+                for relative_name in deleted:
+                    files.pop(relative_name)
+
+            checkpointed_at = time.monotonic()
+            for start in range(0, len(candidates), batch_size):
+                # A failed batch is left out of ``files``, so the next scan picks it up again.
+                totals.update(
+                    self._sync_batch(candidates[start : start + batch_size], files, vector_store)
+                )
+                if time.monotonic() - checkpointed_at >= checkpoint_interval:
+                    vector_store.flush()
+                    _save_state(state_path, state)
+                    checkpointed_at = time.monotonic()
+        _save_state(state_path, state)
+
+        skipped += totals["skipped"]
+        changed = totals["ingested"] + totals["failed"] + totals["retry"]
+        elapsed = max(time.monotonic() - started, 1e-9)
+        summary = (
+            f"Synced {root}: {totals['ingested']} files ingested, {totals['failed']} failed, "
+            f"{len(deleted)} removed, {skipped} skipped, "
+            f"{len(seen) - changed - skipped} unchanged"
+        )
+        if totals["retry"]:
+            summary += f", {totals['retry']} left for the next scan"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary} in {elapsed:.1f}s ({totals['ingested'] / elapsed:.1f} files/s, "
+                f"{totals['chunks'] / elapsed:.1f} chunks/s, "
+                f"{totals['bytes'] / elapsed / (1024 * 1024):.2f} MB/s)."
+            )
+        )
+
+    def _sync_batch(self, batch, files, vector_store) -> dict:
+        """Split, embed and store one batch of candidate files, updating ``files`` in place.
+
+        Returns counts of files ``ingested``, files that ``failed`` to be read or
+        decoded, files ``skipped`` because they vanished after the scan, files
+        left to ``retry`` because embedding or storing the batch failed, plus
+        the ``chunks`` and ``bytes`` written.
+        """
+
+        started = time.monotonic()
+        counts = {"ingested": 0, "failed": 0, "retry": 0, "skipped": 0, "chunks": 0, "bytes": 0}
+        to_split = []
+        pending = []
+        for relative_name, path, extension in batch:
+            try:
+                stat = path.stat()
+                file_bytes = path.read_bytes()
+            except FileNotFoundError:
+                # Removed since the scan; the next scan treats it as deleted.
+                counts["skipped"] += 1
+                self.stderr.write(f"Skipping '{relative_name}': it was removed during the sync.")
+                continue
+            except OSError as exc:
+                # Not recorded in the state, so it is tried again on every scan.
+                counts["failed"] += 1
+                self.stderr.write(f"Unable to read '{relative_name}': {exc}")
+                continue
+
+            digest = hashlib.sha256(file_bytes).hexdigest()
+            entry = files.get(relative_name)
+            if entry and entry["sha256"] == digest:
+                # Touched but not modified: only the recorded mtime moves.
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                continue
+
+            to_split.append((relative_name, extension, file_bytes))
+            pending.append(
+                {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+            )
+
+        if not to_split:
+            return counts
+
+        chunks_by_file: list[list] = [[] for _ in to_split]
+        try:
+            for position, result in split_files(to_split, skip_errors=True):
+                if "error" in result:
+                    self.stderr.write(result["error"])
+                    pending[position]["error"] = result["error"]
+                    continue
+                chunks_by_file[position] = result["chunks"]
+
+            # One embedding job per batch, sent in EMBEDDING_BATCH_SIZE slices.
+            chunks = [chunk for file_chunks in chunks_by_file for chunk in file_chunks]
+            documents = [
+                {"page_content": chunk.page_content, "metadata": chunk.metadata}
+                for chunk in chunks
+            ]
+            if chunks:
+                vectors, _ = submit_embedding(vector_store.embedding, chunks).result()
+
+            # Old chunks go first so a re-run after a crash never duplicates a file.
+            vector_store.delete_sources({relative_name for relative_name, _, _ in to_split})
+            if documents:
+                vector_store.import_chunks(vectors, documents)
+        except Exception as exc:
+            self.stderr.write(
+                f"Failed to ingest a batch of {len(to_split)} files; "
+                f"they will be retried on the next scan: {exc}"
+            )
+            counts["retry"] = len(to_split)
+            return counts
+
+        for position, (relative_name, _, file_bytes) in enumerate(to_split):
+            pending[position]["chunk_count"] = len(chunks_by_file[position])
+            files[relative_name] = pending[position]
+            if "error" in pending[position]:
+                counts["failed"] += 1
+            else:
+                counts["ingested"] += 1
+                counts["bytes"] += len(file_bytes)
+        counts["chunks"] = len(documents)
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(
+            f"Ingested {counts['ingested']} files ({len(documents)} chunks) in {elapsed:.1f}s "
+            f"({len(documents) / elapsed:.1f} chunks/s)."
+        )
+        return counts
+
+
+def _load_state(state_path: Path) -> dict:
+    try:
+        with open(state_path, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+    except FileNotFoundError:
+        return {"embedding_model": None, "files": {}}
+    except json.JSONDecodeError as exc:
+        raise CommandError(f"Sync state '{state_path}' is not valid JSON: {exc}") from exc
+
+    state.setdefault("files", {})
+    return state
+
+
+def _save_state(state_path: Path, state: dict) -> None:
+    """Write the state atomically so a crash never leaves a truncated file behind."""
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f"{state_path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, state_path)
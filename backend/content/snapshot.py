@@ -0,0 +1,159 @@
+"""On-disk snapshots of the vector index.
+
+A snapshot is a directory holding:
+
+- ``manifest.json``: embedding model, vector dimensions and chunk count.
+- ``vectors.f32``: a raw, row-major float32 matrix that can be memory-mapped.
+- ``chunks.jsonl``: one ``{"page_content", "metadata"}`` object per row.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.jsonl"
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, malformed or incompatible."""
+
+
+def export_snapshot(vector_store, path, embedding_model: str, batch_size: int = 1000) -> dict:
+    """Stream every chunk of ``vector_store`` into a snapshot directory and return its manifest."""
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    # The manifest is written last, so a half-written export is never importable.
+    (path / MANIFEST_FILE).unlink(missing_ok=True)
+
+    count = 0
+    dimensions = None
+    with open(path / VECTORS_FILE, "wb") as vectors_file, open(
+        path / CHUNKS_FILE, "w", encoding="utf-8"
+    ) as chunks_file:
+        for vectors, documents in vector_store.export_chunks(batch_size=batch_size):
+            if not documents:
+                continue
+            if dimensions is None:
+                dimensions = int(vectors.shape[1])
+            elif vectors.shape[1] != dimensions:
+                raise SnapshotError(
+                    f"Index holds vectors of mixed dimensions ({dimensions} and {vectors.shape[1]})."
+                )
+
+            np.ascontiguousarray(vectors, dtype=np.float32).tofile(vectors_file)
+            for document in documents:
+                chunks_file.write(json.dumps(document, ensure_ascii=False))
+                chunks_file.write("\n")
+            count += len(documents)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "embedding_model": embedding_model,
+        "dimensions": dimensions or 0,
+        "count": count,
+        "dtype": "float32",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(path / MANIFEST_FILE, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return manifest
+
+
+def read_manifest(path) -> dict:
+    """Load and validate the manifest of a snapshot directory."""
+
+    manifest_path = Path(path) / MANIFEST_FILE
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError as exc:
+        raise SnapshotError(f"No snapshot manifest found at '{manifest_path}'.") from exc
+    except json.JSONDecodeError as exc:
+        raise SnapshotError(f"Snapshot manifest '{manifest_path}' is not valid JSON: {exc}") from exc
+
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format version {manifest.get('format_version')!r}."
+        )
+
+    return manifest
+
+
+def import_snapshot(
+    vector_store,
+    path,
+    embedding_model: str,
+    batch_size: int = 1000,
+    allow_model_mismatch: bool = False,
+    replace: bool = False,
+):
+    """Bulk-load a snapshot into ``vector_store``, yielding the running chunk count per batch."""
+
+    path = Path(path)
+    manifest = read_manifest(path)
+
+    if manifest["embedding_model"] != embedding_model and not allow_model_mismatch:
+        raise SnapshotError(
+            f"Snapshot was built with embedding model '{manifest['embedding_model']}', "
+            f"but this deployment uses '{embedding_model}'."
+        )
+
+    count = manifest["count"]
+    if count == 0:
+        return
+
+    expected_size = count * manifest["dimensions"] * np.dtype(np.float32).itemsize
+    try:
+        actual_size = (path / VECTORS_FILE).stat().st_size
+    except FileNotFoundError as exc:
+        raise SnapshotError(f"Snapshot is missing {VECTORS_FILE}.") from exc
+    if actual_size != expected_size:
+        raise SnapshotError(
+            f"{VECTORS_FILE} is {actual_size} bytes but the manifest describes "
+            f"{count} x {manifest['dimensions']} float32 vectors ({expected_size} bytes)."
+        )
+
+    vectors = np.memmap(
+        path / VECTORS_FILE,
+        dtype=np.float32,
+        mode="r",
+        shape=(count, manifest["dimensions"]),
+    )
+
+    # Backends that rewrite their whole index per write (NumPy) persist once
+    # at the end, and leave the index untouched if the import fails.
+    with vector_store.buffered_writes():
+        if replace:
+            sources = set()
+            with open(path / CHUNKS_FILE, encoding="utf-8") as chunks_file:
+                for line in chunks_file:
+                    sources.add(json.loads(line)["metadata"].get("source"))
+            sources.discard(None)
+            vector_store.delete_sources(sources)
+
+        loaded = 0
+        batch: list[dict] = []
+        with open(path / CHUNKS_FILE, encoding="utf-8") as chunks_file:
+            for line in chunks_file:
+                if loaded + len(batch) >= count:
+                    raise SnapshotError(f"{CHUNKS_FILE} holds more chunks than the manifest lists.")
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    vector_store.import_chunks(vectors[loaded : loaded + len(batch)], batch)
+                    loaded += len(batch)
+                    batch = []
+                    yield loaded
+            if batch:
+                vector_store.import_chunks(vectors[loaded : loaded + len(batch)], batch)
+                loaded += len(batch)
+                yield loaded
+
+        if loaded != count:
+            raise SnapshotError(f"Snapshot lists {count} chunks but {CHUNKS_FILE} holds {loaded}.")
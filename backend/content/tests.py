@@ -1,3 +1,894 @@
-from django.test import TestCase
+import fcntl
+import io
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from redisvl.exceptions import RedisSearchError
+
+from content import ingest
+from content import vector_store as vector_store_module
+from content.deadline import Deadline, StageSkipped
+from content.management.commands.sync_directory import STATE_FILE_NAME
+from content.snapshot import VECTORS_FILE
+from content.vector_store import NumpyBackend, RedisBackend
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _FakeRedisStore:
+    """Stands in for a RedisVectorStore bound to one node."""
+
+    def __init__(self, url, error=None):
+        self.url = url
+        self.error = error
+
+    def similarity_search_by_vector(self, query_embedding, k, filter=None):
+        if self.error is not None:
+            raise self.error
+        return [self.url]
+
+
+class RedisReplicaFailoverTests(TestCase):
+    primary = "redis://primary:6379/0"
+    replica = "redis://replica:6379/0"
+
+    def setUp(self):
+        vector_store_module._replica_sets.clear()
+        vector_store_module._redis_vector_stores.clear()
+        self.backend = RedisBackend(redis_url=self.primary, replica_urls=[self.replica])
+        # Treat the replica as freshly health-checked.
+        self.backend.replicas._checked_at[self.replica] = time.monotonic()
+
+    def _patch_stores(self, replica_error=None):
+        stores = {
+            self.primary: _FakeRedisStore(self.primary),
+            self.replica: _FakeRedisStore(self.replica, replica_error),
+        }
+        opened = []
+
+        def from_existing_index(embedding, redis_client, index_name, embedding_dimensions):
+            url = redis_client.url
+            opened.append(url)
+            return stores[url]
+
+        def get_client(url, decode_responses=False):
+            return mock.Mock(url=url)
+
+        patches = [
+            mock.patch(
+                "langchain_redis.RedisVectorStore.from_existing_index",
+                side_effect=from_existing_index,
+            ),
+            mock.patch.object(vector_store_module, "_get_redis_client", side_effect=get_client),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return opened
+
+    def test_search_prefers_replica_and_caches_store(self):
+        opened = self._patch_stores()
+
+        self.assertEqual(self.backend.search([1.0, 0.0], k=1), [self.replica])
+        self.assertEqual(self.backend.search([1.0, 0.0], k=1), [self.replica])
+        self.assertEqual(opened, [self.replica])
+
+    def test_search_falls_back_to_primary_on_redis_search_error(self):
+        opened = self._patch_stores(replica_error=RedisSearchError("LOADING"))
+
+        self.assertEqual(self.backend.search([1.0, 0.0], k=1), [self.primary])
+        self.assertEqual(opened, [self.replica, self.primary])
+        self.assertEqual(self.backend.replicas.read_urls(), [self.primary])
+
+    def test_primary_is_never_marked_down(self):
+        self.backend.replicas.mark_down(self.primary)
+
+        self.assertEqual(self.backend.replicas.read_urls(), [self.replica, self.primary])
+
+
+REDIS_SERVER = os.getenv("REDIS_STACK_SERVER") or shutil.which("redis-stack-server")
+
+
+@unittest.skipUnless(REDIS_SERVER, "redis-stack-server is not installed")
+class LocalRedisFailoverTests(TestCase):
+    """Runs a primary and a replica as local redis-stack-server processes."""
+
+    def setUp(self):
+        vector_store_module._replica_sets.clear()
+        vector_store_module._redis_vector_stores.clear()
+        vector_store_module._redis_clients.clear()
+        self.processes = {}
+        primary_port = self._start_server()
+        replica_port = self._start_server("--replicaof", "127.0.0.1", str(primary_port))
+        self.primary = f"redis://127.0.0.1:{primary_port}/0"
+        self.replica = f"redis://127.0.0.1:{replica_port}/0"
+
+    def _start_server(self, *args) -> int:
+        port = _free_port()
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, True)
+        process = subprocess.Popen(
+            [REDIS_SERVER, "--port", str(port), "--dir", workdir, "--save", "", *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(process.wait)
+        self.addCleanup(process.terminate)
+        self.processes[port] = process
+        self._wait_for(
+            lambda: vector_store_module._get_redis_client(f"redis://127.0.0.1:{port}/0").ping()
+        )
+        return port
+
+    def _wait_for(self, predicate, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if predicate():
+                    return
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for local Redis")
+            time.sleep(0.1)
+
+    def test_reads_use_replica_and_survive_its_loss(self):
+        backend = RedisBackend(
+            redis_url=self.primary, index_name="idx_test", replica_urls=[self.replica]
+        )
+        backend.import_chunks(
+            np.eye(2, dtype=np.float32),
+            [
+                {"page_content": "first", "metadata": {"source": "a.txt"}},
+                {"page_content": "second", "metadata": {"source": "b.txt"}},
+            ],
+        )
+        self._wait_for(
+            lambda: vector_store_module._get_redis_client(self.replica).info("replication")[
+                "master_link_status"
+            ]
+            == "up"
+        )
+        self._wait_for(lambda: len(backend.search([1.0, 0.0], k=2)) == 2)
+        self.assertIn(self.replica, backend.replicas.read_urls())
+
+        replica_port = int(self.replica.rsplit(":", 1)[1].split("/")[0])
+        self.processes[replica_port].kill()
+        self.processes[replica_port].wait()
+
+        docs = backend.search([1.0, 0.0], k=1)
+        self.assertEqual(docs[0].page_content, "first")
+        self.assertEqual(backend.replicas.read_urls(), [self.primary])
+
+
+def _document(text, source):
+    return {"page_content": text, "metadata": {"source": source}}
+
+
+class _StubEmbedder:
+    """Embeds text as a deterministic 3-dimensional vector, without Ollama."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(text.count("a")), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class _NumpyIndexTestCase(SimpleTestCase):
+    """Selects a fresh on-disk NumPy index, under ``self.tmp``, as the vector store."""
+
+    def setUp(self):
+        vector_store_module._numpy_indexes.clear()
+        self.addCleanup(vector_store_module._numpy_indexes.clear)
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.enterContext(
+            override_settings(
+                EMBEDDING_MODEL="test-model",
+                VECTOR_STORE_BACKEND="numpy",
+                VECTOR_STORE_OPTIONS={
+                    "numpy": {"path": os.path.join(self.tmp, "index"), "dtype": "float32"}
+                },
+            )
+        )
+
+
+class NumpyBackendTests(_NumpyIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = NumpyBackend(_StubEmbedder())
+        self.backend.import_chunks(
+            np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]], dtype=np.float32),
+            [_document("x", "a.txt"), _document("xy", "a.txt"), _document("y", "b.txt")],
+        )
+
+    def _texts(self, documents):
+        return [document.page_content for document in documents]
+
+    def test_search_returns_top_k_by_similarity(self):
+        self.assertEqual(self._texts(self.backend.search([1.0, 0.1], k=2)), ["x", "xy"])
+        self.assertEqual(self._texts(self.backend.search([0.0, 1.0], k=5)), ["y", "xy", "x"])
+
+    def test_search_filters_by_source(self):
+        self.assertEqual(
+            self._texts(self.backend.search([0.0, 1.0], k=2, source="a.txt")), ["xy", "x"]
+        )
+        self.assertEqual(self.backend.search([0.0, 1.0], k=2, source="missing.txt"), [])
+
+    def test_delete_sources(self):
+        self.assertEqual(self.backend.delete_sources({"a.txt", "missing.txt"}), {"a.txt"})
+        self.assertEqual(self._texts(self.backend.search([1.0, 0.0], k=5)), ["y"])
+        self.assertEqual(self.backend.delete_sources({"a.txt"}), set())
+
+    def test_dimension_mismatch_is_rejected(self):
+        with self.assertRaises(RuntimeError):
+            self.backend.import_chunks(np.ones((1, 3), dtype=np.float32), [_document("z", "c.txt")])
+
+    def test_reloads_from_disk(self):
+        backend = NumpyBackend(path=self.tmp)
+        backend.import_chunks(
+            np.eye(2, dtype=np.float32), [_document("x", "a.txt"), _document("y", "b.txt")]
+        )
+        backend.delete_sources({"b.txt"})
+
+        vector_store_module._numpy_indexes.clear()
+        reloaded = NumpyBackend(path=self.tmp)
+
+        self.assertEqual(self._texts(reloaded.search([0.0, 1.0], k=5)), ["x"])
+        self.assertEqual(len(list(Path(self.tmp).glob("gen-*"))), 1)
+
+    def test_sees_writes_from_another_instance_of_the_same_path(self):
+        reader = NumpyBackend(path=self.tmp)
+        self.assertEqual(reader.search([1.0, 0.0], k=1), [])
+
+        # Stands in for another worker process writing to the same directory.
+        writer_index = vector_store_module._NumpyIndex(Path(self.tmp), "float32")
+        writer_index.write(
+            set(), np.eye(2, dtype=np.float32), [_document("x", "a.txt"), _document("y", "b.txt")]
+        )
+
+        self.assertEqual(self._texts(reader.search([0.0, 1.0], k=1)), ["y"])
+
+    def test_search_does_not_wait_for_writers(self):
+        backend = NumpyBackend(path=self.tmp)
+        backend.import_chunks(np.array([[1.0, 0.0]], dtype=np.float32), [_document("x", "a.txt")])
+
+        # Another process holds the write lock, so this process's writer waits on it.
+        with open(Path(self.tmp) / vector_store_module.NUMPY_LOCK_FILE, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            writer = threading.Thread(
+                target=backend.import_chunks,
+                args=(np.array([[0.0, 1.0]], dtype=np.float32), [_document("y", "b.txt")]),
+            )
+            writer.start()
+            time.sleep(0.1)
+
+            results = []
+            reader = threading.Thread(
+                target=lambda: results.append(backend.search([1.0, 0.0], k=5))
+            )
+            reader.start()
+            reader.join(timeout=5)
+            self.assertFalse(reader.is_alive())
+            self.assertEqual(self._texts(results[0]), ["x"])
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        writer.join(timeout=5)
+        self.assertEqual(self._texts(backend.search([1.0, 0.0], k=5)), ["x", "y"])
+
+    def test_buffered_writes_persist_once(self):
+        backend = NumpyBackend(path=self.tmp)
+        backend.import_chunks(np.array([[1.0, 0.0]], dtype=np.float32), [_document("x", "a.txt")])
+        reader = NumpyBackend(path=self.tmp)
+
+        with mock.patch.object(
+            vector_store_module._NumpyIndex,
+            "_commit",
+            autospec=True,
+            side_effect=vector_store_module._NumpyIndex._commit,
+        ) as commit:
+            with backend.buffered_writes():
+                self.assertEqual(backend.delete_sources({"a.txt", "missing.txt"}), {"a.txt"})
+                backend.import_chunks(
+                    np.array([[0.0, 1.0]], dtype=np.float32), [_document("y", "b.txt")]
+                )
+                backend.import_chunks(
+                    np.array([[1.0, 1.0]], dtype=np.float32), [_document("z", "c.txt")]
+                )
+                self.assertEqual(backend.delete_sources({"c.txt"}), {"c.txt"})
+                self.assertEqual(self._texts(reader.search([1.0, 0.0], k=5)), ["x"])
+
+        self.assertEqual(commit.call_count, 1)
+        self.assertEqual(self._texts(reader.search([1.0, 0.0], k=5)), ["y"])
+
+    def test_buffered_writes_are_dropped_on_error(self):
+        backend = NumpyBackend(path=self.tmp)
+        backend.import_chunks(np.array([[1.0, 0.0]], dtype=np.float32), [_document("x", "a.txt")])
+
+        with self.assertRaises(ValueError):
+            with backend.buffered_writes():
+                backend.delete_sources({"a.txt"})
+                backend.import_chunks(
+                    np.array([[0.0, 1.0]], dtype=np.float32), [_document("y", "b.txt")]
+                )
+                raise ValueError("import aborted")
+
+        self.assertEqual(self._texts(backend.search([1.0, 0.0], k=5)), ["x"])
+        backend.import_chunks(np.array([[0.0, 1.0]], dtype=np.float32), [_document("y", "b.txt")])
+        self.assertEqual(self._texts(backend.search([1.0, 0.0], k=5)), ["x", "y"])
+
+    def test_float16_storage(self):
+        backend = NumpyBackend(path=self.tmp, dtype="float16")
+        backend.import_chunks(np.array([[3.0, 4.0]], dtype=np.float32), [_document("x", "a.txt")])
+
+        self.assertEqual(backend.index.state.vectors.dtype, np.float16)
+        self.assertEqual(self._texts(backend.search([3.0, 4.0], k=1)), ["x"])
+        vectors, documents = next(backend.export_chunks())
+        self.assertEqual(vectors.dtype, np.float32)
+        np.testing.assert_allclose(vectors, [[0.6, 0.8]], atol=1e-3)
+
+    def test_concurrent_imports_keep_every_chunk(self):
+        backend = NumpyBackend(path=self.tmp)
+
+        def import_batch(worker):
+            for index in range(10):
+                backend.import_chunks(
+                    np.ones((1, 2), dtype=np.float32),
+                    [_document(f"{worker}-{index}", f"{worker}.txt")],
+                )
+
+        threads = [threading.Thread(target=import_batch, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        vector_store_module._numpy_indexes.clear()
+        self.assertEqual(len(NumpyBackend(path=self.tmp).search([1.0, 1.0], k=100)), 40)
+
+
+class DeadlineTests(SimpleTestCase):
+    def test_run_returns_stage_result(self):
+        deadline = Deadline(total_seconds=5, budgets={"embedding": 1.0})
+
+        self.assertEqual(deadline.run("embedding", lambda value: value * 2, 21), 42)
+        self.assertEqual(deadline.skipped, [])
+
+    def test_stage_over_budget_is_skipped_as_timeout(self):
+        deadline = Deadline(total_seconds=1, budgets={"retrieval": 0.05})
+
+        with self.assertRaises(StageSkipped) as context:
+            deadline.run("retrieval", time.sleep, 0.5)
+
+        self.assertTrue(context.exception.timed_out)
+        self.assertEqual(
+            deadline.skipped, [{"stage": "retrieval", "reason": "exceeded its time budget"}]
+        )
+
+    def test_failing_stage_is_skipped_without_timeout(self):
+        deadline = Deadline(total_seconds=5, budgets={"web_search": 1.0})
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(StageSkipped) as context:
+            deadline.run("web_search", fail)
+
+        self.assertFalse(context.exception.timed_out)
+        self.assertEqual(deadline.skipped, [{"stage": "web_search", "reason": "failed: boom"}])
+
+    def test_expired_deadline_skips_without_running(self):
+        deadline = Deadline(total_seconds=0, budgets={})
+        called = []
+
+        with self.assertRaises(StageSkipped) as context:
+            deadline.run("generation", called.append, True)
+
+        self.assertTrue(context.exception.timed_out)
+        self.assertEqual(called, [])
+
+    def test_stage_timeout_is_capped_by_remaining_time(self):
+        deadline = Deadline(total_seconds=10, budgets={"generation": 1.0})
+        deadline.expires_at = time.monotonic() + 2
+
+        self.assertLessEqual(deadline.stage_timeout("generation"), 2)
+        self.assertAlmostEqual(
+            Deadline(10, {"embedding": 0.1}).stage_timeout("embedding"), 1.0, places=2
+        )
+
+
+def _sleep_then(seconds, value):
+    def run(*args, **kwargs):
+        time.sleep(seconds)
+        return value
+
+    return run
+
+
+@override_settings(
+    REQUEST_DEADLINE_SECONDS=2,
+    REQUEST_STAGE_BUDGETS={
+        "embedding": 0.5,
+        "retrieval": 0.25,
+        "web_search": 0.1,
+        "generation": 0.25,
+    },
+)
+class ReceiveMessageDegradationTests(_NumpyIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        vector_store_module.get_vector_store().import_chunks(
+            np.array([[5.0, 0.0, 1.0]], dtype=np.float32), [_document("alpha", "a.txt")]
+        )
+        self.llm = mock.Mock()
+        self.llm.invoke.return_value = "an answer"
+        patches = [
+            mock.patch("content.views.OllamaLLM", return_value=self.llm),
+            mock.patch("content.views.OllamaEmbeddings", return_value=_StubEmbedder()),
+            mock.patch("content.views.print", create=True),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _post(self, **payload):
+        payload = {"model": "qwen3", "message": "alpha", **payload}
+        return self.client.post(
+            reverse("receive-message"), payload, content_type="application/json"
+        )
+
+    def _skipped(self, response):
+        return {
+            skipped["stage"]: skipped["reason"] for skipped in response.json()["skipped_stages"]
+        }
+
+    def test_answers_with_retrieved_chunks_and_web_results(self):
+        with mock.patch("content.views._run_web_search", return_value="web result"):
+            response = self._post(enableWebSearch=True, file=["a.txt"])
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["answer"], "an answer")
+        self.assertEqual(payload["retrieved_chunks"], [{"source": "a.txt", "content": "alpha"}])
+        self.assertEqual(payload["web_search_results"], "web result")
+        self.assertNotIn("skipped_stages", payload)
+
+    def test_failed_web_search_is_skipped(self):
+        with mock.patch("content.views._run_web_search", side_effect=ValueError("no network")):
+            response = self._post(enableWebSearch=True, file=["a.txt"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._skipped(response), {"web_search": "failed: no network"})
+        self.assertEqual(response.json()["knowledge_base_hits"], 1)
+
+    def test_slow_web_search_is_skipped(self):
+        with mock.patch("content.views._run_web_search", side_effect=_sleep_then(1, "late")):
+            response = self._post(enableWebSearch=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._skipped(response), {"web_search": "exceeded its time budget"})
+        self.assertIsNone(response.json()["web_search_results"])
+
+    def test_failed_retrieval_is_skipped(self):
+        with mock.patch("content.views._search_sources", side_effect=RuntimeError("index down")):
+            response = self._post(file=["a.txt"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._skipped(response), {"retrieval": "failed: index down"})
+        self.assertEqual(response.json()["knowledge_base_hits"], 0)
+
+    def test_slow_retrieval_is_skipped(self):
+        with mock.patch("content.views._search_sources", side_effect=_sleep_then(1, [])):
+            response = self._post(file=["a.txt"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._skipped(response), {"retrieval": "exceeded its time budget"})
+
+    def test_generation_timeout_returns_504(self):
+        self.llm.invoke.side_effect = _sleep_then(1, "late")
+
+        with self.assertLogs("django.request", "ERROR"):
+            response = self._post()
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(self._skipped(response), {"generation": "exceeded its time budget"})
+
+    def test_generation_failure_returns_502(self):
+        self.llm.invoke.side_effect = ConnectionError("ollama down")
+
+        with self.assertLogs("django.request", "ERROR"):
+            response = self._post()
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(self._skipped(response), {"generation": "failed: ollama down"})
+
+
+class SnapshotCommandTests(_NumpyIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.snapshot = os.path.join(self.tmp, "snapshot")
+        self.backend = vector_store_module.get_vector_store()
+        self.backend.import_chunks(
+            np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], dtype=np.float32),
+            [_document("x", "a.txt"), _document("y", "b.txt"), _document("xy", "b.txt")],
+        )
+
+    def _call(self, name, *args):
+        call_command(name, *args, stdout=io.StringIO())
+
+    def _texts(self):
+        return sorted(document.page_content for document in self.backend.search([1.0, 1.0], k=100))
+
+    def test_round_trip(self):
+        self._call("export_index", self.snapshot, "--batch-size", "2")
+        self.backend.delete_sources({"a.txt", "b.txt"})
+
+        self._call("import_index", self.snapshot, "--batch-size", "2")
+
+        self.assertEqual(self._texts(), ["x", "xy", "y"])
+        self.assertEqual(self.backend.search([1.0, 0.0], k=1)[0].page_content, "x")
+
+    def test_replace_drops_existing_chunks_of_snapshot_sources(self):
+        self._call("export_index", self.snapshot)
+
+        self._call("import_index", self.snapshot)
+        self.assertEqual(len(self._texts()), 6)
+
+        self._call("import_index", self.snapshot, "--replace")
+        self.assertEqual(self._texts(), ["x", "xy", "y"])
+
+    def test_model_mismatch_is_rejected(self):
+        self._call("export_index", self.snapshot)
+
+        with override_settings(EMBEDDING_MODEL="other-model"):
+            with self.assertRaisesMessage(CommandError, "test-model"):
+                self._call("import_index", self.snapshot)
+            self._call("import_index", self.snapshot, "--allow-model-mismatch")
+
+        self.assertEqual(len(self._texts()), 6)
+
+    def test_import_writes_the_index_once(self):
+        self._call("export_index", self.snapshot)
+
+        with mock.patch.object(
+            vector_store_module._NumpyIndex,
+            "_commit",
+            autospec=True,
+            side_effect=vector_store_module._NumpyIndex._commit,
+        ) as commit:
+            self._call("import_index", self.snapshot, "--replace", "--batch-size", "1")
+
+        self.assertEqual(commit.call_count, 1)
+        self.assertEqual(self._texts(), ["x", "xy", "y"])
+
+    def test_failed_import_leaves_the_index_untouched(self):
+        self._call("export_index", self.snapshot)
+        with open(
+            os.path.join(self.snapshot, "chunks.jsonl"), "a", encoding="utf-8"
+        ) as chunks_file:
+            chunks_file.write('{"page_content": "extra", "metadata": {"source": "c.txt"}}\n')
+
+        with self.assertRaisesMessage(CommandError, "more chunks"):
+            self._call("import_index", self.snapshot, "--replace", "--batch-size", "1")
+
+        self.assertEqual(self._texts(), ["x", "xy", "y"])
+
+    def test_truncated_vectors_file_is_rejected(self):
+        self._call("export_index", self.snapshot)
+        vectors_path = os.path.join(self.snapshot, VECTORS_FILE)
+        os.truncate(vectors_path, os.path.getsize(vectors_path) - 4)
+
+        with self.assertRaisesMessage(CommandError, VECTORS_FILE):
+            self._call("import_index", self.snapshot)
+
+
+class UploadDocumentTests(_NumpyIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.embedder = _StubEmbedder()
+        patcher = mock.patch("content.views.OllamaEmbeddings", return_value=self.embedder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = vector_store_module.get_vector_store()
+        self.store.import_chunks(
+            np.array([[1.0, 0.0, 1.0]], dtype=np.float32), [_document("old alpha", "a.txt")]
+        )
+
+    def _upload(self, *files):
+        uploads = [SimpleUploadedFile(name, content) for name, content in files]
+        return self.client.post(reverse("upload-document"), {"file": uploads})
+
+    def _indexed(self):
+        documents = self.store.search([0.0, 0.0, 1.0], k=100)
+        return sorted(
+            (document.metadata["source"], document.page_content) for document in documents
+        )
+
+    def test_splits_in_process_pool_and_replaces_previous_chunks(self):
+        with mock.patch.object(
+            ingest, "_get_process_pool", wraps=ingest._get_process_pool
+        ) as get_pool:
+            response = self._upload(("a.txt", b"new alpha"), ("b.txt", b"bravo"))
+
+        self.assertEqual(response.status_code, 200)
+        get_pool.assert_called_once_with()
+        self.assertIsInstance(ingest._process_pool, ingest.ProcessPoolExecutor)
+        payload = response.json()
+        self.assertEqual(payload["file_count"], 2)
+        self.assertEqual(payload["total_chunks"], 2)
+        self.assertEqual(
+            [(result["file_name"], result["replaced_previous"]) for result in payload["files"]],
+            [("a.txt", True), ("b.txt", False)],
+        )
+        self.assertEqual(self._indexed(), [("a.txt", "new alpha"), ("b.txt", "bravo")])
+
+    def test_reports_timings(self):
+        response = self._upload(("a.txt", b"alpha"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json()["timings"]),
+            {"load_seconds", "split_seconds", "wall_seconds", "embed_seconds"},
+        )
+
+    def test_embedding_starts_before_later_files_are_split(self):
+        embedded = threading.Event()
+        embed_documents = self.embedder.embed_documents
+
+        def record_embedding(texts):
+            embedded.set()
+            return embed_documents(texts)
+
+        seen_before_second_split = []
+
+        def split_in_order(files):
+            for position, (file_name, extension, file_bytes) in enumerate(files):
+                if position:
+                    seen_before_second_split.append(embedded.wait(timeout=5))
+                result = ingest.split_file(
+                    file_name, extension, file_bytes, ingest.get_splitter_options(extension)
+                )
+                result["wall_seconds"] = 0.0
+                yield position, result
+
+        with mock.patch.object(self.embedder, "embed_documents", side_effect=record_embedding):
+            with mock.patch("content.views.split_files", side_effect=split_in_order):
+                response = self._upload(("a.txt", b"alpha"), ("b.txt", b"bravo"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(seen_before_second_split, [True])
+
+    def test_bad_utf8_rejects_the_whole_upload(self):
+        with self.assertLogs("django.request", "WARNING"):
+            response = self._upload(("a.txt", b"new alpha"), ("b.txt", b"\xff\xfe\xfa"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("b.txt", response.json()["detail"])
+        self.assertEqual(self._indexed(), [("a.txt", "old alpha")])
+
+    def test_embedding_failure_returns_502_and_keeps_the_index(self):
+        with mock.patch.object(
+            self.embedder, "embed_documents", side_effect=ConnectionError("ollama down")
+        ):
+            with self.assertLogs("django.request", "ERROR"):
+                response = self._upload(("a.txt", b"new alpha"), ("b.txt", b"bravo"))
+
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("ollama down", response.json()["detail"])
+        self.assertEqual(self._indexed(), [("a.txt", "old alpha")])
+
+    @override_settings(
+        TEXT_SPLITTER_OPTIONS={
+            "default": {"chunk_size": 20, "chunk_overlap": 0},
+            "docx": {"chunk_size": 1000},
+        }
+    )
+    def test_splitter_options_layer_per_extension(self):
+        self.assertEqual(ingest.get_splitter_options("txt"), {"chunk_size": 20, "chunk_overlap": 0})
+        self.assertEqual(
+            ingest.get_splitter_options("docx"), {"chunk_size": 1000, "chunk_overlap": 0}
+        )
+
+        text = b"alpha bravo charlie delta echo foxtrot golf hotel"
+        response = self._upload(("a.txt", text), ("a.docx", text))
+
+        self.assertEqual([result["chunk_count"] for result in response.json()["files"]], [3, 1])
+
+
+class SyncDirectoryCommandTests(_NumpyIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = Path(self.tmp) / "docs"
+        self.root.mkdir()
+        self.embedder = _StubEmbedder()
+        patcher = mock.patch(
+            "content.management.commands.sync_directory.OllamaEmbeddings",
+            return_value=self.embedder,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sync(self, *args):
+        stdout = io.StringIO()
+        call_command("sync_directory", str(self.root), *args, stdout=stdout, stderr=io.StringIO())
+        return stdout.getvalue().strip().splitlines()[-1]
+
+    def _sources(self):
+        documents = vector_store_module.get_vector_store().search([1.0, 0.0, 0.0], k=100)
+        return sorted({document.metadata["source"] for document in documents})
+
+    def test_new_changed_touched_and_deleted_files(self):
+        (self.root / "a.txt").write_text("alpha")
+        (self.root / "nested").mkdir()
+        (self.root / "nested" / "b.txt").write_text("bravo")
+        (self.root / "ignored.pdf").write_text("not an allowed type")
+
+        self.assertIn("2 files ingested", self._sync())
+        self.assertEqual(self._sources(), ["a.txt", "nested/b.txt"])
+
+        summary = self._sync()
+        self.assertIn("0 files ingested", summary)
+        self.assertIn("2 unchanged", summary)
+
+        os.utime(self.root / "a.txt", ns=(0, 10**18))
+        calls = len(self.embedder.calls)
+        self.assertIn("0 files ingested", self._sync())
+        self.assertEqual(len(self.embedder.calls), calls)
+
+        (self.root / "a.txt").write_text("alpha, again")
+        self.assertIn("1 files ingested", self._sync())
+        documents = vector_store_module.get_vector_store().search(
+            [1.0, 0.0, 0.0], k=100, source="a.txt"
+        )
+        self.assertEqual([document.page_content for document in documents], ["alpha, again"])
+
+        (self.root / "nested" / "b.txt").unlink()
+        self.assertIn("1 removed", self._sync())
+        self.assertEqual(self._sources(), ["a.txt"])
+
+    @override_settings(EMBEDDING_BATCH_SIZE=2)
+    def test_chunks_are_embedded_in_slices_across_files(self):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (self.root / name).write_text(name)
+
+        self._sync()
+
+        self.assertEqual([len(texts) for texts in self.embedder.calls], [2, 1])
+
+    def test_undecodable_files_are_reported_as_failed(self):
+        (self.root / "a.txt").write_text("alpha")
+        (self.root / "bad.txt").write_bytes(b"\xff\xfe\xfa")
+
+        summary = self._sync()
+
+        self.assertIn("1 files ingested, 1 failed", summary)
+        self.assertEqual(self._sources(), ["a.txt"])
+
+    def test_failed_batch_is_retried_on_the_next_run(self):
+        (self.root / "a.txt").write_text("alpha")
+        (self.root / "b.txt").write_text("bravo")
+
+        with mock.patch.object(
+            self.embedder, "embed_documents", side_effect=ConnectionError("down")
+        ):
+            summary = self._sync()
+
+        self.assertIn("0 files ingested", summary)
+        self.assertIn("2 left for the next scan", summary)
+        self.assertEqual(self._sources(), [])
+
+        self.assertIn("2 files ingested", self._sync())
+        self.assertEqual(self._sources(), ["a.txt", "b.txt"])
+
+    def test_resumes_from_saved_state(self):
+        (self.root / "a.txt").write_text("alpha")
+        self._sync()
+        (self.root / "b.txt").write_text("bravo")
+
+        self.assertTrue((self.root / STATE_FILE_NAME).exists())
+        summary = self._sync()
+
+        self.assertIn("1 files ingested", summary)
+        self.assertIn("1 unchanged", summary)
+        self.assertEqual(self.embedder.calls[-1], ["bravo"])
+
+    def test_file_removed_after_the_scan_is_skipped(self):
+        (self.root / "a.txt").write_text("alpha")
+        (self.root / "b.txt").write_text("bravo")
+        embed_documents = self.embedder.embed_documents
+
+        def remove_b_then_embed(texts):
+            (self.root / "b.txt").unlink(missing_ok=True)
+            return embed_documents(texts)
+
+        with mock.patch.object(self.embedder, "embed_documents", side_effect=remove_b_then_embed):
+            summary = self._sync("--batch-size", "1")
+
+        self.assertIn("1 files ingested, 0 failed, 0 removed, 1 skipped", summary)
+        self.assertEqual(self._sources(), ["a.txt"])
+        self.assertIn("0 removed", self._sync())
+
+    def test_unreadable_file_is_failed_and_retried(self):
+        (self.root / "a.txt").write_text("alpha")
+        (self.root / "locked.txt").write_text("lima")
+        (self.root / "z.txt").write_text("zulu")
+        read_bytes = Path.read_bytes
+
+        def deny_locked(path):
+            if path.name == "locked.txt":
+                raise PermissionError(13, "Permission denied", str(path))
+            return read_bytes(path)
+
+        with mock.patch.object(Path, "read_bytes", autospec=True, side_effect=deny_locked):
+            self.assertIn("2 files ingested, 1 failed", self._sync("--batch-size", "2"))
+            self.assertIn("0 files ingested, 1 failed", self._sync())
+
+        self.assertEqual(self._sources(), ["a.txt", "z.txt"])
+        self.assertIn("1 files ingested, 0 failed", self._sync())
+        self.assertEqual(self._sources(), ["a.txt", "locked.txt", "z.txt"])
+
+    def test_scan_writes_the_index_once(self):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (self.root / name).write_text(name)
+
+        with mock.patch.object(
+            vector_store_module._NumpyIndex,
+            "_commit",
+            autospec=True,
+            side_effect=vector_store_module._NumpyIndex._commit,
+        ) as commit:
+            self.assertIn("3 files ingested", self._sync("--batch-size", "1"))
+
+        self.assertEqual(commit.call_count, 1)
+        self.assertEqual(self._sources(), ["a.txt", "b.txt", "c.txt"])
+
+    def test_interrupted_run_resumes_from_the_last_checkpoint(self):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (self.root / name).write_text(name)
+        embed_documents = self.embedder.embed_documents
+
+        def interrupt_on_c(texts):
+            if "c.txt" in texts:
+                raise KeyboardInterrupt
+            return embed_documents(texts)
+
+        with mock.patch.object(self.embedder, "embed_documents", side_effect=interrupt_on_c):
+            stdout = io.StringIO()
+            call_command(
+                "sync_directory",
+                str(self.root),
+                "--batch-size",
+                "1",
+                "--checkpoint-interval",
+                "0",
+                stdout=stdout,
+                stderr=io.StringIO(),
+            )
+
+        self.assertIn("Stopped.", stdout.getvalue())
+        self.assertEqual(self._sources(), ["a.txt", "b.txt"])
+        self.assertIn("1 files ingested", self._sync())
+        self.assertEqual(self.embedder.calls[-1], ["c.txt"])
@@ -0,0 +1,708 @@
+"""Vector store backends used by the upload and chat views."""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import redis
+from django.conf import settings
+from langchain_core.documents import Document
+from redis.commands.search.query import Query
+
+REDIS_INDEX_NAME = "idx_chunks"
+NUMPY_CURRENT_FILE = "CURRENT"
+NUMPY_LOCK_FILE = ".lock"
+
+_redis_clients: dict[tuple[str, bool], redis.Redis] = {}
+_redis_clients_lock = threading.Lock()
+
+
+def _get_redis_client(redis_url: str, decode_responses: bool = False) -> redis.Redis:
+    """Return a shared client (and connection pool) for ``redis_url``."""
+
+    key = (redis_url, decode_responses)
+    with _redis_clients_lock:
+        client = _redis_clients.get(key)
+        if client is None:
+            timeout = getattr(settings, "REDIS_SOCKET_TIMEOUT", None)
+            client = _redis_clients[key] = redis.from_url(
+                redis_url,
+                decode_responses=decode_responses,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+            )
+        return client
+
+
+class RedisReplicaSet:
+    """Pick a Redis node for read traffic: healthy replicas first, then the primary.
+
+    Replicas are used round-robin. A replica is health-checked (PING plus an
+    up link to its primary) at most every ``check_interval`` seconds; one
+    that fails a check or a query is skipped for ``retry_after`` seconds.
+    """
+
+    def __init__(self, primary_url: str, replica_urls, check_interval: float, retry_after: float):
+        self.primary_url = primary_url
+        self.replica_urls = list(replica_urls)
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until: dict[str, float] = {}
+        self._checked_at: dict[str, float] = {}
+
+    def read_urls(self) -> list[str]:
+        """Return the nodes to try for a read, in order, ending with the primary."""
+
+        with self._lock:
+            count = len(self.replica_urls)
+            rotated = [
+                self.replica_urls[(self._next + offset) % count] for offset in range(count)
+            ]
+            self._next = (self._next + 1) % count if count else 0
+
+        return [url for url in rotated if self._is_healthy(url)] + [self.primary_url]
+
+    def mark_down(self, url: str) -> None:
+        if url == self.primary_url:
+            return
+        with self._lock:
+            self._down_until[url] = time.monotonic() + self.retry_after
+
+    def _is_healthy(self, url: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._down_until.get(url, 0.0) > now:
+                return False
+            if now - self._checked_at.get(url, float("-inf")) < self.check_interval:
+                return True
+            self._checked_at[url] = now
+
+        try:
+            replication = _get_redis_client(url).info("replication")
+            healthy = (
+                replication.get("role") != "slave"
+                or replication.get("master_link_status") == "up"
+            )
+        except redis.exceptions.RedisError:
+            healthy = False
+
+        if not healthy:
+            self.mark_down(url)
+        return healthy
+
+
+_redis_vector_stores: dict[tuple[str, str, int], object] = {}
+_redis_vector_stores_lock = threading.Lock()
+
+_replica_sets: dict[tuple, RedisReplicaSet] = {}
+_replica_sets_lock = threading.Lock()
+
+
+def _get_replica_set(primary_url: str, replica_urls) -> RedisReplicaSet:
+    """Return the process-wide replica set so health state outlives a single request."""
+
+    key = (primary_url, tuple(replica_urls))
+    with _replica_sets_lock:
+        replica_set = _replica_sets.get(key)
+        if replica_set is None:
+            replica_set = _replica_sets[key] = RedisReplicaSet(
+                primary_url,
+                replica_urls,
+                check_interval=getattr(settings, "REDIS_REPLICA_HEALTH_CHECK_SECONDS", 5),
+                retry_after=getattr(settings, "REDIS_REPLICA_RETRY_SECONDS", 30),
+            )
+        return replica_set
+
+
+class VectorStoreBackend(ABC):
+    """Interface every vector store backend implements."""
+
+    def __init__(self, embedding=None):
+        self.embedding = embedding
+
+    @abstractmethod
+    def delete_sources(self, sources: set[str]) -> set[str]:
+        """Remove all chunks for the provided sources and return the ones that were deleted."""
+
+    @abstractmethod
+    def search(self, query_embedding: list[float], k: int, source: str | None = None):
+        """Return the ``k`` chunks closest to ``query_embedding``, optionally for one source."""
+
+    @abstractmethod
+    def export_chunks(self, batch_size: int = 1000):
+        """Yield ``(vectors, documents)`` batches covering every stored chunk.
+
+        ``vectors`` is a float32 array with one row per entry of ``documents``;
+        each document is a ``{"page_content": ..., "metadata": ...}`` dict.
+        """
+
+    @abstractmethod
+    def import_chunks(self, vectors: np.ndarray, documents: list[dict]) -> None:
+        """Store chunks whose embeddings are already known, skipping the embedder."""
+
+    @contextmanager
+    def buffered_writes(self):
+        """Group the deletes and imports made inside the block into as few writes as possible.
+
+        Buffered writes are persisted by :meth:`flush` and when the block exits
+        normally; they are dropped if it raises. Backends whose writes are
+        already incremental ignore this.
+        """
+
+        yield self
+
+    def flush(self) -> None:
+        """Persist the writes buffered so far inside :meth:`buffered_writes`."""
+
+
+class RedisBackend(VectorStoreBackend):
+    """Store chunks in a Redis Stack index through ``langchain_redis``.
+
+    Writes always go to ``redis_url`` (the primary). Searches and exports are
+    spread over ``replica_urls`` and fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        embedding=None,
+        redis_url: str | None = None,
+        index_name: str = REDIS_INDEX_NAME,
+        replica_urls=(),
+    ):
+        super().__init__(embedding)
+        self.redis_url = redis_url or getattr(
+            settings, "REDIS_URL", "redis://127.0.0.1:6379/0"
+        )
+        self.index_name = index_name
+        self.replicas = _get_replica_set(self.redis_url, replica_urls)
+
+    def delete_sources(self, sources: set[str]) -> set[str]:
+        if not sources:
+            return set()
+
+        try:
+            client = _get_redis_client(self.redis_url, decode_responses=True)
+        except redis.exceptions.RedisError as exc:  # pragma: no cover - connection guard
+            raise RuntimeError(f"Unable to connect to Redis: {exc}") from exc
+
+        deleted_sources: set[str] = set()
+        search = client.ft(self.index_name)
+        for source in sources:
+            query_string = f'@source:"{source}"'
+            page_size = 500
+
+            while True:
+                query = Query(query_string).return_fields().paging(0, page_size)
+                try:
+                    result = search.search(query)
+                except redis.exceptions.ResponseError as exc:
+                    exc_message = str(exc).lower()
+                    if "unknown index name" in exc_message or "no such index" in exc_message:
+                        # No index has been created yet, nothing to delete.
+                        return deleted_sources
+                    raise RuntimeError(
+                        f"Unable to inspect existing chunks for '{source}': {exc}"
+                    ) from exc
+
+                docs = getattr(result, "docs", None) or []
+                if not docs:
+                    break
+
+                ids = [doc.id for doc in docs if getattr(doc, "id", None)]
+                if not ids:
+                    break
+
+                try:
+                    # UNLINK frees memory in the background instead of blocking the primary.
+                    client.unlink(*ids)
+                except redis.exceptions.RedisError as exc:
+                    raise RuntimeError(
+                        f"Unable to remove existing chunks for '{source}': {exc}"
+                    ) from exc
+
+                deleted_sources.add(source)
+
+        return deleted_sources
+
+    def search(self, query_embedding: list[float], k: int, source: str | None = None):
+        from redisvl.exceptions import RedisVLError
+
+        filter_expression = f'@source:"{source}"' if source is not None else None
+        last_error = None
+        for url in self.replicas.read_urls():
+            try:
+                vector_store = self._vector_store_for(url, len(query_embedding))
+                return vector_store.similarity_search_by_vector(
+                    query_embedding,
+                    k=k,
+                    filter=filter_expression,
+                )
+            except (redis.exceptions.RedisError, RedisVLError) as exc:
+                # redisvl wraps FT.INFO/FT.SEARCH failures (timeouts, LOADING,
+                # missing index) in RedisSearchError, not RedisError.
+                self._drop_vector_store(url, len(query_embedding))
+                self.replicas.mark_down(url)
+                last_error = exc
+
+        raise last_error
+
+    def _vector_store_for(self, url: str, dimensions: int):
+        """Return a cached store bound to one node, so a search is a single FT.SEARCH."""
+
+        from langchain_redis import RedisVectorStore
+
+        key = (url, self.index_name, dimensions)
+        with _redis_vector_stores_lock:
+            vector_store = _redis_vector_stores.get(key)
+        if vector_store is None:
+            # Known dimensions stop langchain_redis from embedding a probe text.
+            vector_store = RedisVectorStore.from_existing_index(
+                embedding=self.embedding,
+                redis_client=_get_redis_client(url),
+                index_name=self.index_name,
+                embedding_dimensions=dimensions,
+            )
+            with _redis_vector_stores_lock:
+                _redis_vector_stores[key] = vector_store
+        return vector_store
+
+    def _drop_vector_store(self, url: str, dimensions: int) -> None:
+        with _redis_vector_stores_lock:
+            _redis_vector_stores.pop((url, self.index_name, dimensions), None)
+
+    def export_chunks(self, batch_size: int = 1000):
+        client = _get_redis_client(self.replicas.read_urls()[0])
+        keys: list[bytes] = []
+        try:
+            for key in client.scan_iter(match=f"{self.index_name}:*", count=batch_size):
+                keys.append(key)
+                if len(keys) >= batch_size:
+                    yield self._read_records(client, keys)
+                    keys = []
+            if keys:
+                yield self._read_records(client, keys)
+        except redis.exceptions.RedisError as exc:
+            raise RuntimeError(f"Unable to read chunks from Redis: {exc}") from exc
+
+    @staticmethod
+    def _read_records(client, keys: list[bytes]):
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.hgetall(key)
+
+        vectors = []
+        documents = []
+        for record in pipeline.execute():
+            if b"embedding" not in record or b"text" not in record:
+                continue
+            vectors.append(np.frombuffer(record[b"embedding"], dtype=np.float32))
+            metadata = json.loads(record.get(b"_metadata_json", b"{}"))
+            documents.append(
+                {"page_content": record[b"text"].decode("utf-8"), "metadata": metadata}
+            )
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32), documents
+        return np.vstack(vectors), documents
+
+    def import_chunks(self, vectors: np.ndarray, documents: list[dict]) -> None:
+        from langchain_redis import RedisVectorStore
+        from redisvl.exceptions import RedisVLError
+
+        if not documents:
+            return
+
+        try:
+            # Passing the dimensions keeps the store from probing the embedder.
+            vector_store = RedisVectorStore(
+                embeddings=self.embedding,
+                redis_client=_get_redis_client(self.redis_url),
+                index_name=self.index_name,
+                embedding_dimensions=int(vectors.shape[1]),
+            )
+        except (RedisVLError, redis.exceptions.RedisError) as exc:
+            raise RuntimeError(f"Unable to open the Redis index: {exc}") from exc
+        separator = vector_store.config.default_tag_separator
+
+        # Mirror the record layout of RedisVectorStore.add_texts.
+        records = []
+        for vector, document in zip(vectors, documents):
+            metadata = document["metadata"]
+            record = {
+                "text": document["page_content"],
+                "embedding": np.asarray(vector, dtype=np.float32).tobytes(),
+                "_index_name": self.index_name,
+                "_metadata_json": json.dumps(metadata),
+            }
+            for field_name, field_value in metadata.items():
+                if field_value is None:
+                    continue
+                if isinstance(field_value, list):
+                    record[field_name] = separator.join(field_value)
+                else:
+                    record[field_name] = field_value
+            records.append(record)
+
+        try:
+            vector_store.index.load(records, batch_size=len(records))
+        except (RedisVLError, redis.exceptions.RedisError) as exc:
+            raise RuntimeError(f"Unable to store chunks in Redis: {exc}") from exc
+
+
+class _NumpyIndexState(NamedTuple):
+    """One immutable snapshot of the index; replaced as a whole on every write."""
+
+    generation: str | None
+    vectors: np.ndarray
+    documents: list[dict]
+    source_ids: np.ndarray
+    source_names: list[str]
+
+
+def _numpy_index_state(generation: str | None, vectors: np.ndarray, documents: list[dict]):
+    codes: dict[str, int] = {}
+    ids = np.empty(len(documents), dtype=np.int32)
+    for position, document in enumerate(documents):
+        source = document["metadata"].get("source", "")
+        ids[position] = codes.setdefault(source, len(codes))
+    return _NumpyIndexState(generation, vectors, documents, ids, list(codes))
+
+
+class _NumpyIndex:
+    """Contiguous, normalised embedding matrix plus chunk text, shared per path.
+
+    On disk each write produces a new immutable generation directory holding
+    ``vectors.npy`` and ``documents.json``; the ``CURRENT`` file names the live
+    one and is swapped with a single rename, so readers never see vectors
+    from one write paired with documents from another. Writers from every
+    process serialise on an ``fcntl`` lock; readers take no lock and work on
+    whichever :class:`_NumpyIndexState` was current when they started.
+    """
+
+    def __init__(self, path: Path | None, dtype: str):
+        self.path = Path(path) if path else None
+        self.dtype = np.dtype(dtype)
+        self.write_mutex = threading.Lock()
+        self.state = _numpy_index_state(None, np.empty((0, 0), dtype=self.dtype), [])
+        self._refresh()
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialise writers in this process and, for on-disk indexes, across processes."""
+
+        with self.write_mutex:
+            if self.path is None:
+                yield
+                return
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / NUMPY_LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _current_generation(self) -> str | None:
+        try:
+            return (self.path / NUMPY_CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load(self, generation: str | None) -> _NumpyIndexState:
+        if generation is None:
+            return _numpy_index_state(None, np.empty((0, 0), dtype=self.dtype), [])
+
+        generation_dir = self.path / generation
+        with open(generation_dir / "documents.json", encoding="utf-8") as handle:
+            documents = json.load(handle)
+        if documents:
+            vectors = np.load(generation_dir / "vectors.npy", mmap_mode="r")
+        else:
+            vectors = np.empty((0, 0), dtype=self.dtype)
+        return _numpy_index_state(generation, vectors, documents)
+
+    def _refresh(self) -> _NumpyIndexState:
+        """Return the current state, picking up writes made by other worker processes."""
+
+        state = self.state
+        if self.path is None:
+            return state
+
+        for _ in range(5):
+            generation = self._current_generation()
+            if generation == state.generation:
+                return state
+            try:
+                state = self.state = self._load(generation)
+                return state
+            except FileNotFoundError:
+                # A writer replaced and removed that generation while we read it.
+                continue
+
+        raise RuntimeError(f"Unable to load the NumPy vector index at '{self.path}'.")
+
+    def _commit(self, vectors: np.ndarray, documents: list[dict]) -> None:
+        """Write a new generation and make it current. Caller holds the write lock."""
+
+        if self.path is None:
+            self.state = _numpy_index_state(None, vectors, documents)
+            return
+
+        generation_dir = Path(tempfile.mkdtemp(prefix="gen-", dir=self.path))
+        np.save(generation_dir / "vectors.npy", vectors)
+        with open(generation_dir / "documents.json", "w", encoding="utf-8") as handle:
+            json.dump(documents, handle, ensure_ascii=False)
+
+        descriptor, tmp_current = tempfile.mkstemp(prefix=f"{NUMPY_CURRENT_FILE}.", dir=self.path)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            handle.write(generation_dir.name)
+        os.replace(tmp_current, self.path / NUMPY_CURRENT_FILE)
+
+        # Reopen as a memory map so the resident copy is dropped.
+        self.state = _numpy_index_state(
+            generation_dir.name,
+            np.load(generation_dir / "vectors.npy", mmap_mode="r"),
+            documents,
+        )
+
+        # Readers that already mapped an old generation keep their mapping.
+        for old_dir in self.path.glob("gen-*"):
+            if old_dir.name != generation_dir.name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+    def write(
+        self,
+        deleted_sources: set[str],
+        vectors: np.ndarray | None = None,
+        documents: list[dict] = (),
+    ) -> set[str]:
+        """Drop the chunks of ``deleted_sources``, then append ``documents``, as one generation.
+
+        Returns the sources that had chunks to drop.
+        """
+
+        if documents:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            normalised = (vectors / norms).astype(self.dtype)
+
+        with self._write_lock():
+            state = self._refresh()
+            codes = [
+                code for code, name in enumerate(state.source_names) if name in deleted_sources
+            ]
+            if not codes and not documents:
+                return set()
+
+            kept_vectors = state.vectors
+            kept_documents = state.documents
+            if codes:
+                keep = ~np.isin(state.source_ids, codes)
+                kept_vectors = kept_vectors[keep]
+                kept_documents = [
+                    document for document, kept in zip(kept_documents, keep) if kept
+                ]
+
+            if not documents:
+                merged = np.ascontiguousarray(kept_vectors)
+            elif kept_vectors.size:
+                if kept_vectors.shape[1] != normalised.shape[1]:
+                    raise RuntimeError(
+                        f"Embedding dimension {normalised.shape[1]} does not match "
+                        f"the index dimension {kept_vectors.shape[1]}."
+                    )
+                merged = np.concatenate([kept_vectors, normalised])
+            else:
+                merged = np.ascontiguousarray(normalised)
+            self._commit(merged, kept_documents + list(documents))
+
+        return {state.source_names[code] for code in codes}
+
+    def search(self, query_embedding: list[float], k: int, source: str | None):
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        state = self._refresh()
+        if source is None:
+            candidates = None
+        else:
+            try:
+                code = state.source_names.index(source)
+            except ValueError:
+                return []
+            candidates = np.flatnonzero(state.source_ids == code)
+
+        if not state.documents or k <= 0:
+            return []
+
+        matrix = state.vectors if candidates is None else state.vectors[candidates]
+        # float16 storage halves memory, but the dot product is done in float32.
+        scores = matrix.astype(np.float32, copy=False) @ query
+
+        top_count = min(k, scores.shape[0])
+        if top_count == 0:
+            return []
+        top = np.argpartition(-scores, top_count - 1)[:top_count]
+        top = top[np.argsort(-scores[top])]
+        if candidates is not None:
+            top = candidates[top]
+
+        return [
+            Document(
+                page_content=state.documents[position]["page_content"],
+                metadata=state.documents[position]["metadata"],
+            )
+            for position in top
+        ]
+
+    def export(self, batch_size: int):
+        state = self._refresh()
+        for start in range(0, len(state.documents), batch_size):
+            end = start + batch_size
+            yield np.asarray(state.vectors[start:end], dtype=np.float32), state.documents[start:end]
+
+
+_numpy_indexes: dict[tuple[str, str], _NumpyIndex] = {}
+_numpy_indexes_lock = threading.Lock()
+
+
+class _NumpyWriteBuffer:
+    """Deletes and imports held back by :meth:`NumpyBackend.buffered_writes`."""
+
+    def __init__(self):
+        self.deleted_sources: set[str] = set()
+        self.vectors: list[np.ndarray] = []
+        self.documents: list[list[dict]] = []
+        self.sources: set[str] = set()
+
+    def delete(self, sources: set[str]) -> None:
+        self.deleted_sources |= sources
+        if not self.sources & sources:
+            return
+
+        # Chunks imported earlier in the block are dropped here; the rest of
+        # the delete is applied to the stored index when the buffer is flushed.
+        for position, documents in enumerate(self.documents):
+            keep = [document["metadata"].get("source") not in sources for document in documents]
+            self.vectors[position] = self.vectors[position][np.asarray(keep, dtype=bool)]
+            self.documents[position] = [
+                document for document, kept in zip(documents, keep) if kept
+            ]
+        self.sources -= sources
+
+    def add(self, vectors: np.ndarray, documents: list[dict]) -> None:
+        if self.vectors and self.vectors[0].shape[1] != vectors.shape[1]:
+            raise RuntimeError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"the dimension {self.vectors[0].shape[1]} of the buffered chunks."
+            )
+        self.vectors.append(vectors)
+        self.documents.append(list(documents))
+        self.sources.update(document["metadata"].get("source") for document in documents)
+
+
+class NumpyBackend(VectorStoreBackend):
+    """In-process brute-force backend over a memory-mapped NumPy matrix.
+
+    Suited to small corpora and tests: no Redis server is needed, and the
+    index is persisted under ``path`` (or kept in memory when ``path`` is None).
+    Every write rewrites the whole matrix, so bulk loads should run inside
+    :meth:`buffered_writes`.
+    """
+
+    def __init__(self, embedding=None, path: str | Path | None = None, dtype: str = "float32"):
+        super().__init__(embedding)
+        key = (str(path) if path else "", np.dtype(dtype).name)
+        with _numpy_indexes_lock:
+            index = _numpy_indexes.get(key)
+            if index is None:
+                index = _numpy_indexes[key] = _NumpyIndex(path, dtype)
+        self.index = index
+        self._buffer: _NumpyWriteBuffer | None = None
+
+    def delete_sources(self, sources: set[str]) -> set[str]:
+        if not sources:
+            return set()
+        if self._buffer is None:
+            return self.index.write(set(sources))
+
+        stored = set(self.index._refresh().source_names)
+        deleted = set(sources) & (stored | self._buffer.sources)
+        self._buffer.delete(set(sources))
+        return deleted
+
+    def search(self, query_embedding: list[float], k: int, source: str | None = None):
+        return self.index.search(query_embedding, k, source)
+
+    def export_chunks(self, batch_size: int = 1000):
+        return self.index.export(batch_size)
+
+    def import_chunks(self, vectors: np.ndarray, documents: list[dict]) -> None:
+        if not documents:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._buffer is None:
+            self.index.write(set(), vectors, documents)
+        else:
+            self._buffer.add(vectors, documents)
+
+    @contextmanager
+    def buffered_writes(self):
+        if self._buffer is not None:
+            yield self
+            return
+
+        self._buffer = _NumpyWriteBuffer()
+        try:
+            yield self
+            self.flush()
+        finally:
+            self._buffer = None
+
+    def flush(self) -> None:
+        buffer = self._buffer
+        if buffer is None:
+            return
+
+        documents = [document for batch in buffer.documents for document in batch]
+        if not documents and not buffer.deleted_sources:
+            return
+        vectors = np.concatenate(buffer.vectors) if documents else None
+        self.index.write(buffer.deleted_sources, vectors, documents)
+        self._buffer = _NumpyWriteBuffer()
+
+
+BACKENDS = {
+    "redis": RedisBackend,
+    "numpy": NumpyBackend,
+}
+
+
+def get_vector_store(embedding=None) -> VectorStoreBackend:
+    """Return the backend selected by ``VECTOR_STORE_BACKEND`` in settings."""
+
+    backend_name = getattr(settings, "VECTOR_STORE_BACKEND", "redis")
+    try:
+        backend_class = BACKENDS[backend_name]
+    except KeyError as exc:
+        raise RuntimeError(
+            f"Unknown vector store backend '{backend_name}'. "
+            f"Allowed: {', '.join(sorted(BACKENDS))}."
+        ) from exc
+
+    options = getattr(settings, "VECTOR_STORE_OPTIONS", {}).get(backend_name, {})
+    return backend_class(embedding, **options)
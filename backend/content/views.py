@@ -1,21 +1,26 @@
 import json
-import os
 import re
-import tempfile
+from concurrent.futures.process import BrokenProcessPool
 
-import redis
+import numpy as np
 from django.conf import settings
 from django.shortcuts import render
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import TextLoader
 from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_redis import RedisVectorStore
 from langchain_ollama import OllamaEmbeddings
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from langchain_ollama import OllamaLLM
-from redis.commands.search.query import Query
+
+from .deadline import Deadline, StageSkipped
+from .ingest import (
+    ALLOWED_FILE_TYPES,
+    MAX_FILE_SIZE_BYTES,
+    IngestError,
+    split_files,
+    submit_embedding,
+)
+from .vector_store import get_vector_store
 
 MODELS = {
     "qwen3": "qwen3:30b",
@@ -23,10 +28,6 @@ MODELS = {
     "gpt-oss": "gpt-oss:20b",
 }
 
-ALLOWED_FILE_TYPES = {"txt", "doc", "docx"}
-MAX_FILE_SIZE_BYTES = 1 * 1024 * 1024  # 1 MB
-REDIS_INDEX_NAME = "idx_chunks"
-
 
 def index(request):
     """Render the simple homepage."""
@@ -39,80 +40,6 @@ def index(request):
     return render(request, "index.html", context)
 
 
-def _load_documents_from_bytes(file_bytes: bytes, extension: str, file_name: str):
-    """Persist uploaded bytes temporarily and load them with TextLoader."""
-
-    suffix = f".{extension}" if extension else ""
-    tmp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            tmp_file.write(file_bytes)
-            tmp_path = tmp_file.name
-
-        loader = TextLoader(tmp_path, encoding="utf-8")
-        documents = loader.load()
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-
-    for document in documents:
-        document.metadata["source"] = file_name
-
-    return documents
-
-
-
-
-def _delete_existing_sources(redis_url: str, index_name: str, sources: set[str]) -> set[str]:
-    """Remove all chunks for the provided sources and return the ones that were deleted."""
-
-    if not sources:
-        return set()
-
-    try:
-        client = redis.from_url(redis_url, decode_responses=True)
-    except redis.exceptions.RedisError as exc:  # pragma: no cover - connection guard
-        raise RuntimeError(f"Unable to connect to Redis: {exc}") from exc
-
-    deleted_sources: set[str] = set()
-    search = client.ft(index_name)
-    for source in sources:
-        query_string = f'@source:"{source}"'
-        page_size = 500
-
-        while True:
-            query = Query(query_string).return_fields().paging(0, page_size)
-            try:
-                result = search.search(query)
-            except redis.exceptions.ResponseError as exc:
-                exc_message = str(exc).lower()
-                if "unknown index name" in exc_message or "no such index" in exc_message:
-                    # No index has been created yet, nothing to delete.
-                    return deleted_sources
-                raise RuntimeError(
-                    f"Unable to inspect existing chunks for '{source}': {exc}"
-                ) from exc
-
-            docs = getattr(result, "docs", None) or []
-            if not docs:
-                break
-
-            ids = [doc.id for doc in docs if getattr(doc, "id", None)]
-            if not ids:
-                break
-
-            try:
-                client.delete(*ids)
-            except redis.exceptions.RedisError as exc:
-                raise RuntimeError(
-                    f"Unable to remove existing chunks for '{source}': {exc}"
-                ) from exc
-
-            deleted_sources.add(source)
-
-    return deleted_sources
-
-
 @api_view(["POST"])
 def upload_document(request):
     """Handle one or more document uploads without persisting them to disk."""
@@ -130,8 +57,7 @@ def upload_document(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
-    aggregated_chunks = []
+    files_to_split: list[tuple[str, str, bytes]] = []
     per_file_results = []
 
     sources_to_replace: set[str] = set()
@@ -161,96 +87,88 @@ def upload_document(request):
             )
 
         upload.seek(0)
-        file_bytes = upload.read()
-
-        try:
-            file_content = file_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            return Response(
-                {
-                    "detail": (
-                        f"Only UTF-8 encoded text files are supported (failed on '{file_name}')."
-                    )
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        try:
-            documents = _load_documents_from_bytes(file_bytes, extension, file_name)
-        except Exception as exc:  # pragma: no cover - defensive guard
-            return Response(
-                {"detail": f"Unable to load document '{file_name}': {exc}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        chunked_documents = text_splitter.split_documents(documents)
-        aggregated_chunks.extend(chunked_documents)
-
+        files_to_split.append((file_name, extension, upload.read()))
         per_file_results.append(
             {
                 "status": "processed",
                 "file_name": file_name,
                 "file_size": upload.size,
-                "content_length": len(file_content),
-                "chunk_count": len(chunked_documents),
             }
         )
         sources_to_replace.add(file_name)
 
-    redis_url = getattr(settings, "REDIS_URL", "redis://127.0.0.1:6379/0")
+    embedder = OllamaEmbeddings(
+        model=getattr(settings, "EMBEDDING_MODEL", "qwen3-embedding:0.6b"),
+        base_url=getattr(settings, "OLLAMA_BASE_URL", "http://192.168.50.17:11434"),
+    )
 
+    # Each file is embedded as soon as it has been split, while the rest of
+    # the upload is still being processed. Nothing is written to the vector
+    # store until every file has been split successfully.
+    chunks_by_file: list[list] = [[] for _ in files_to_split]
+    embedding_futures = {}
     try:
-        replaced_sources = _delete_existing_sources(
-            redis_url=redis_url,
-            index_name=REDIS_INDEX_NAME,
-            sources=sources_to_replace,
-        )
-    except RuntimeError as exc:  # pragma: no cover - redis/vector store runtime guard
+        for position, split_result in split_files(files_to_split):
+            chunks = split_result["chunks"]
+            chunks_by_file[position] = chunks
+            per_file_results[position].update(
+                {
+                    "content_length": split_result["content_length"],
+                    "chunk_count": len(chunks),
+                    "timings": {
+                        "load_seconds": round(split_result["load_seconds"], 4),
+                        "split_seconds": round(split_result["split_seconds"], 4),
+                        "wall_seconds": round(split_result["wall_seconds"], 4),
+                    },
+                }
+            )
+            if chunks:
+                embedding_futures[position] = submit_embedding(embedder, chunks)
+    except IngestError as exc:
+        for future in embedding_futures.values():
+            future.cancel()
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except BrokenProcessPool as exc:  # pragma: no cover - worker process crash guard
         return Response(
-            {"detail": str(exc)},
+            {"detail": f"Unable to split uploaded documents: {exc}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    if replaced_sources:
-        for result in per_file_results:
-            result["replaced_previous"] = result["file_name"] in replaced_sources
-    else:
-        for result in per_file_results:
-            result["replaced_previous"] = False
-
-    if not aggregated_chunks:
-        # Nothing to embed, return the per-file metadata as-is.
-        if len(per_file_results) == 1:
-            return Response(per_file_results[0], status=status.HTTP_200_OK)
-
-        total_chunks = sum(result["chunk_count"] for result in per_file_results)
+    # Wait for every embedding before touching the store, so a failure leaves
+    # the previously indexed chunks of every file in place.
+    vectors = []
+    documents = []
+    try:
+        for position, future in sorted(embedding_futures.items()):
+            file_vectors, embed_seconds = future.result()
+            per_file_results[position]["timings"]["embed_seconds"] = round(embed_seconds, 4)
+            vectors.append(file_vectors)
+            documents.extend(
+                {"page_content": chunk.page_content, "metadata": chunk.metadata}
+                for chunk in chunks_by_file[position]
+            )
+    except Exception as exc:  # pragma: no cover - embedding runtime guard
+        for future in embedding_futures.values():
+            future.cancel()
         return Response(
-            {
-                "status": "processed",
-                "file_count": len(per_file_results),
-                "total_chunks": total_chunks,
-                "files": per_file_results,
-            },
-            status=status.HTTP_200_OK,
+            {"detail": f"Unable to embed document chunks: {exc}"},
+            status=status.HTTP_502_BAD_GATEWAY,
         )
 
-    embedder = OllamaEmbeddings(
-        model="qwen3-embedding:0.6b",
-        base_url="http://192.168.50.17:11434",
-    )
     try:
-        RedisVectorStore.from_documents(
-            documents=aggregated_chunks,
-            embedding=embedder,
-            redis_url=redis_url,
-            index_name=REDIS_INDEX_NAME,
-        )
+        vector_store = get_vector_store(embedder)
+        replaced_sources = vector_store.delete_sources(sources_to_replace)
+        if documents:
+            vector_store.import_chunks(np.vstack(vectors), documents)
     except Exception as exc:  # pragma: no cover - redis/vector store runtime guard
         return Response(
-            {"detail": f"Unable to store document chunks in Redis: {exc}"},
+            {"detail": f"Unable to store document chunks in the vector store: {exc}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+    for result in per_file_results:
+        result["replaced_previous"] = result["file_name"] in replaced_sources
+
     if len(per_file_results) == 1:
         return Response(per_file_results[0], status=status.HTTP_200_OK)
 
@@ -285,10 +203,34 @@ def _normalize_file_names(raw_names):
     return cleaned
 
 
+def _search_sources(embedder, query_embedding: list[float], sources: list[str]):
+    """Return the top chunks for each source using a precomputed query embedding."""
+
+    vector_store = get_vector_store(embedder)
+
+    docs = []
+    for source in sources:
+        try:
+            docs.extend(vector_store.search(query_embedding, k=3, source=source))
+        except Exception as exc:
+            raise RuntimeError(
+                f"Similarity search failed for source '{source}': {exc}"
+            ) from exc
+
+    return docs
+
+
+def _run_web_search(question: str):
+    """Run a DuckDuckGo search for the question."""
+
+    search_tool = DuckDuckGoSearchRun()
+    return search_tool.run(question)
+
+
 @api_view(["POST"])
 def receive_message(request):
 
-    base_url = "http://192.168.50.17:11434"
+    base_url = getattr(settings, "OLLAMA_BASE_URL", "http://192.168.50.17:11434")
 
     data = request.data
     if not data:
@@ -297,47 +239,35 @@ def receive_message(request):
     model_name = MODELS[data["model"]]
     question = data["message"]
 
-    llm = OllamaLLM(model=model_name, base_url=base_url)
-
-    embedder = OllamaEmbeddings(
-        model="qwen3-embedding:0.6b",
-        base_url=base_url,
-    )
-
-    redis_url = getattr(settings, "REDIS_URL", "redis://127.0.0.1:6379/0")
-    try:
-        vector_store = RedisVectorStore.from_existing_index(
-            embedding=embedder,
-            redis_url=redis_url,
-            index_name=REDIS_INDEX_NAME,
-        )
-    except Exception as exc:  # pragma: no cover - vector store runtime guard
-        return Response(
-            {"detail": f"Unable to connect to Redis vector index: {exc}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
+    deadline = Deadline()
+    enable_web_search = bool(data.get("enableWebSearch"))
+    web_search_results = None
+    web_search_future = None
+    if enable_web_search:
+        # Web search does not depend on retrieval, so let it run alongside it.
+        web_search_future = deadline.submit("web_search", _run_web_search, question)
 
     file_names = _normalize_file_names(data.get("file"))
     allowed_sources = set(file_names)
     retrieved_docs = []
 
     if allowed_sources:
-        filtered_docs = []
-        for source in sorted(allowed_sources):
-            filter_expression = f'@source:"{source}"'
-            try:
-                docs_for_source = vector_store.similarity_search(
-                    question,
-                    k=3,
-                    filter=filter_expression,
-                )
-                filtered_docs.extend(docs_for_source)
-            except Exception as exc:  # pragma: no cover - vector store runtime guard
-                raise RuntimeError(
-                    f"Similarity search failed for source '{source}': {exc}"
-                ) from exc
-
-        retrieved_docs = filtered_docs
+        embedder = OllamaEmbeddings(
+            model=getattr(settings, "EMBEDDING_MODEL", "qwen3-embedding:0.6b"),
+            base_url=base_url,
+            client_kwargs={"timeout": deadline.stage_timeout("embedding")},
+        )
+        try:
+            query_embedding = deadline.run("embedding", embedder.embed_query, question)
+            retrieved_docs = deadline.run(
+                "retrieval",
+                _search_sources,
+                embedder,
+                query_embedding,
+                sorted(allowed_sources),
+            )
+        except StageSkipped:
+            retrieved_docs = []
 
     formatted_chunks = []
     for doc in retrieved_docs:
@@ -345,14 +275,11 @@ def receive_message(request):
         chunk = doc.page_content.strip()
         formatted_chunks.append(f"Source: {source}\n{chunk}")
 
-    enable_web_search = bool(data.get("enableWebSearch"))
-    web_search_results = None
-    if enable_web_search:
+    if web_search_future is not None:
         try:
-            search_tool = DuckDuckGoSearchRun()
-            web_search_results = search_tool.run(question)
-        except Exception as exc:  # pragma: no cover - web search runtime guard
-            web_search_results = f"Web search failed: {exc}"
+            web_search_results = deadline.wait("web_search", *web_search_future)
+        except StageSkipped:
+            web_search_results = None
 
     knowledge_context: str | None = None
     if formatted_chunks:
@@ -410,7 +337,25 @@ def receive_message(request):
         )
 
     print(f"[Frontend] Received payload from frontend: {data}")
-    answer = llm.invoke(prompt)
+    llm = OllamaLLM(
+        model=model_name,
+        base_url=base_url,
+        client_kwargs={"timeout": deadline.stage_timeout("generation")},
+    )
+    try:
+        answer = deadline.run("generation", llm.invoke, prompt)
+    except StageSkipped as exc:
+        return Response(
+            {
+                "detail": f"Unable to generate an answer: {exc.reason}",
+                "skipped_stages": deadline.skipped,
+            },
+            status=(
+                status.HTTP_504_GATEWAY_TIMEOUT
+                if exc.timed_out
+                else status.HTTP_502_BAD_GATEWAY
+            ),
+        )
 
     thinking = None
     think_match = re.search(r"<think>(.*?)</think>", str(answer), flags=re.DOTALL)
@@ -434,5 +379,7 @@ def receive_message(request):
         ]
     if enable_web_search:
         response_payload["web_search_results"] = web_search_results
+    if deadline.skipped:
+        response_payload["skipped_stages"] = deadline.skipped
 
     return Response(response_payload)